@@ -39,14 +39,25 @@ def pdf(pdf_path, model, charset):
 
 @main.command()
 @click.option('--force', '-f', is_flag=True, help='Force re-download')
-def download(force):
+@click.option('--int8', is_flag=True, help='Also build the int8 quantized model')
+def download(force, int8):
     """Download model files to local cache."""
     manager = ModelManager()
-    if force and (manager.cache_dir / manager.MODEL_FILENAME).exists():
-        (manager.cache_dir / manager.MODEL_FILENAME).unlink()
+    if force:
+        model_path = manager.cache_dir / manager.MODEL_FILENAME
+        int8_path = manager.cache_dir / manager.INT8_MODEL_FILENAME
+        partial = (
+            model_path.with_name(model_path.name + ".part"),
+            model_path.with_name(model_path.name + ".part.validator"),
+        )
+        for path in (model_path, *partial, int8_path):
+            if path.exists():
+                path.unlink()
         
     try:
         manager.get_model_path() # Triggers download if missing
+        if int8:
+            manager.get_int8_model_path()
         click.echo("Model is ready.")
     except Exception as e:
         click.echo(f"Error: {e}", err=True)
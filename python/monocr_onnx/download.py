@@ -1,7 +1,7 @@
 import argparse
-import requests
 import os
 from pathlib import Path
+from . import model_manager
 
 MODEL_URLS = {
     "onnx": "https://huggingface.co/janakh/monocr/resolve/main/onnx/monocr.onnx",
@@ -11,13 +11,8 @@ MODEL_URLS = {
 
 def download_file(url, dest):
     print(f"Downloading {url} to {dest}...")
-    response = requests.get(url, stream=True)
-    response.raise_for_status()
-    
     os.makedirs(os.path.dirname(dest), exist_ok=True)
-    with open(dest, "wb") as f:
-        for chunk in response.iter_content(chunk_size=8192):
-            f.write(chunk)
+    model_manager.download_file(url, dest)
     print(f"Done.")
 
 def main():
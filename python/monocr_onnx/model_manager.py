@@ -1,10 +1,107 @@
 import os
 import requests
 from pathlib import Path
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 
+CHUNK_SIZE = 1024 * 1024 # 1 MiB
+
+# Pooled session so repeated downloads reuse the TLS connection
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_maxsize=4))
+_SESSION.mount("http://", HTTPAdapter(pool_maxsize=4))
+
+def _validator(response):
+    """
+    Strong ETag or Last-Modified of a response, usable in If-Range.
+    """
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+def _content_range_total(response):
+    """
+    Total size from a 'bytes a-b/total' or 'bytes */total' Content-Range header.
+    """
+    total = response.headers.get("Content-Range", "").rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+def download_file(url, dest_path, desc=None):
+    """
+    Stream url to dest_path via a .part file, resuming a previous partial
+    download with an HTTP Range request when one exists. The resume is sent
+    with If-Range, so a file that changed upstream is downloaded in full
+    instead of being spliced onto the old partial data.
+    """
+    dest_path = Path(dest_path)
+    part_path = dest_path.with_name(dest_path.name + ".part")
+    validator_path = dest_path.with_name(dest_path.name + ".part.validator")
+
+    resume_from = 0
+    headers = {}
+    if part_path.exists() and validator_path.exists():
+        resume_from = part_path.stat().st_size
+        headers = {
+            "Range": f"bytes={resume_from}-",
+            "If-Range": validator_path.read_text(encoding="utf-8"),
+        }
+
+    with _SESSION.get(url, stream=True, allow_redirects=True, headers=headers) as response:
+        if response.status_code == 416:
+            if _content_range_total(response) == resume_from:
+                # The partial file is already complete
+                os.replace(part_path, dest_path)
+                validator_path.unlink()
+                return
+            # Partial file is unusable; start over
+            part_path.unlink()
+            validator_path.unlink()
+            return download_file(url, dest_path, desc)
+        response.raise_for_status()
+
+        if response.status_code == 206:
+            total_size = _content_range_total(response)
+        else:
+            # Fresh download, or the server ignored Range / the file changed upstream
+            resume_from = 0
+            total_size = None
+            if response.headers.get("Content-Encoding", "identity") == "identity":
+                total_size = int(response.headers.get('content-length', 0)) or None
+            validator = _validator(response)
+            if validator:
+                validator_path.write_text(validator, encoding="utf-8")
+            elif validator_path.exists():
+                validator_path.unlink()
+
+        mode = "ab" if resume_from else "wb"
+
+        with open(part_path, mode) as f, tqdm(
+            desc=desc or dest_path.name,
+            total=total_size or 0,
+            initial=resume_from,
+            unit='iB',
+            unit_scale=True,
+            unit_divisor=1024,
+        ) as bar:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                size = f.write(chunk)
+                bar.update(size)
+
+    size = part_path.stat().st_size
+    if total_size is not None and size != total_size:
+        part_path.unlink()
+        if validator_path.exists():
+            validator_path.unlink()
+        raise RuntimeError(f"Downloaded {size} bytes from {url}, expected {total_size}")
+
+    os.replace(part_path, dest_path)
+    if validator_path.exists():
+        validator_path.unlink()
+
 class ModelManager:
     MODEL_FILENAME = "monocr.onnx"
+    INT8_MODEL_FILENAME = "monocr.int8.onnx"
     MODEL_URL = "https://huggingface.co/janakhpon/monocr/resolve/main/onnx/monocr.onnx"
     
     def __init__(self):
@@ -18,31 +115,50 @@ class ModelManager:
             self.download_model()
             
         return model_path
+
+    def resolve_model_path(self):
+        """
+        Model to use when none is given: the int8 copy if MONOCR_INT8=1, else the fp32 model.
+        """
+        if os.environ.get('MONOCR_INT8') == '1':
+            return self.get_int8_model_path()
+        return self.get_model_path()
+
+    def get_int8_model_path(self):
+        """
+        Path to a dynamically quantized int8 copy of the model, built on first use.
+        """
+        int8_path = self.cache_dir / self.INT8_MODEL_FILENAME
+
+        if not int8_path.exists():
+            self.quantize_model(self.get_model_path(), int8_path)
+
+        return int8_path
+
+    def quantize_model(self, src_path, dest_path):
+        try:
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+        except ImportError as e:
+            raise RuntimeError(f"int8 quantization requires the 'onnx' package. Error: {e}")
+
+        print(f"Quantizing {src_path} to int8...")
+        tmp_path = Path(dest_path).with_name(Path(dest_path).name + ".tmp")
+        try:
+            quantize_dynamic(str(src_path), str(tmp_path), weight_type=QuantType.QInt8)
+            os.replace(tmp_path, dest_path)
+        except Exception as e:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise RuntimeError(f"Failed to quantize model: {e}")
         
     def download_model(self):
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         dest_path = self.cache_dir / self.MODEL_FILENAME
         
         try:
-            response = requests.get(self.MODEL_URL, stream=True, allow_redirects=True)
-            response.raise_for_status()
-            
-            total_size = int(response.headers.get('content-length', 0))
-            
-            with open(dest_path, "wb") as f, tqdm(
-                desc=self.MODEL_FILENAME,
-                total=total_size,
-                unit='iB',
-                unit_scale=True,
-                unit_divisor=1024,
-            ) as bar:
-                for chunk in response.iter_content(chunk_size=8192):
-                    size = f.write(chunk)
-                    bar.update(size)
-                    
+            # Partial data is kept in monocr.onnx.part so a retry can resume
+            download_file(self.MODEL_URL, dest_path, desc=self.MODEL_FILENAME)
             print(f"Model downloaded successfully to {dest_path}")
             
         except Exception as e:
-            if dest_path.exists():
-                dest_path.unlink() # Clean up partial download
             raise RuntimeError(f"Failed to download model: {e}")
@@ -1,9 +1,43 @@
 from pathlib import Path
 from PIL import Image
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from .model_manager import ModelManager
 from .predictor import MonOCR
 from .utils import calculate_accuracy
 
+# Pages rendered ahead of the page currently being recognized
+PDF_RENDER_AHEAD = 2
+
+# Per-process MonOCR instance used by the read_images / read_pdfs worker pools
+_worker_ocr = None
+
+def _init_worker(model_path, charset_path):
+    global _worker_ocr
+    # ORT already parallelizes internally, so each process gets a 1-thread CPU session
+    # (auto-picking CUDA here would open one GPU context per worker)
+    _worker_ocr = MonOCR(
+        model_path, charset_path,
+        intra_op_num_threads=1, providers=['CPUExecutionProvider']
+    )
+
+def _predict_worker(image_path):
+    return _worker_ocr.predict(image_path)
+
+def _read_pdf_worker(pdf_path):
+    return _ocr_pdf(_worker_ocr, pdf_path)
+
+def _process_pool(workers, model_path, charset_path):
+    if model_path is None:
+        # Resolve (and download) the model once, not in every worker
+        model_path = ModelManager().resolve_model_path()
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(str(model_path), charset_path),
+    )
+
 def read_image(image_path, model_path=None, charset_path=None):
     """
     Recognize text from an image file.
@@ -19,8 +53,6 @@ def read_image(image_path, model_path=None, charset_path=None):
     ocr = MonOCR(model_path, charset_path)
     return ocr.predict(image_path)
 
-from concurrent.futures import ThreadPoolExecutor
-
 def read_images(image_paths, model_path=None, charset_path=None, workers=4):
     """
     Recognize text from multiple image files in parallel.
@@ -29,15 +61,23 @@ def read_images(image_paths, model_path=None, charset_path=None, workers=4):
         image_paths (list[str or Path]): List of paths to image files.
         model_path (str, optional): Path to model.
         charset_path (str, optional): Path to charset.
-        workers (int, optional): Number of parallel workers. Defaults to 4.
+        workers (int, optional): Number of worker processes. Defaults to 4.
         
     Returns:
         list[str]: List of recognized text for each image.
+
+    Note:
+        Workers are separate processes. On platforms that spawn them (macOS, Windows),
+        call this from under an ``if __name__ == "__main__":`` guard.
     """
-    ocr = MonOCR(model_path, charset_path)
+    image_paths = list(image_paths)
+    workers = min(workers, len(image_paths))
+    if workers <= 1:
+        ocr = MonOCR(model_path, charset_path)
+        return [ocr.predict(path) for path in image_paths]
     
-    with ThreadPoolExecutor(max_workers=workers) as executor:
-        results = list(executor.map(ocr.predict, image_paths))
+    with _process_pool(workers, model_path, charset_path) as executor:
+        results = list(executor.map(_predict_worker, image_paths))
         
     return results
 
@@ -53,14 +93,34 @@ def read_pdf(pdf_path, model_path=None, charset_path=None):
     Returns:
         list[str]: list of recognized text per page.
     """
+    ocr = MonOCR(model_path, charset_path)
+    return _ocr_pdf(ocr, pdf_path)
+
+def _render_pdf_page(pdf_path, page):
+    try:
+        return convert_from_path(str(pdf_path), dpi=300, first_page=page, last_page=page)[0]
+    except Exception as e:
+        raise RuntimeError(f"Failed to convert PDF. Ensure poppler-utils is installed. Error: {e}")
+
+def _ocr_pdf(ocr, pdf_path):
     try:
-        images = convert_from_path(str(pdf_path), dpi=300)
+        page_count = pdfinfo_from_path(str(pdf_path))["Pages"]
     except Exception as e:
         raise RuntimeError(f"Failed to convert PDF. Ensure poppler-utils is installed. Error: {e}")
     
-    ocr = MonOCR(model_path, charset_path)
-    # Process pages sequentially as they are in memory
-    results = [ocr.predict(img) for img in images]
+    # Render pages on a background thread, a few ahead, while recognizing the current one
+    results = []
+    with ThreadPoolExecutor(max_workers=1) as renderer:
+        pending = deque(
+            renderer.submit(_render_pdf_page, pdf_path, page)
+            for page in range(1, min(page_count, PDF_RENDER_AHEAD) + 1)
+        )
+        for page in range(1, page_count + 1):
+            img = pending.popleft().result()
+            next_page = page + PDF_RENDER_AHEAD
+            if next_page <= page_count:
+                pending.append(renderer.submit(_render_pdf_page, pdf_path, next_page))
+            results.append(ocr.predict(img))
         
     return results
 
@@ -72,16 +132,23 @@ def read_pdfs(pdf_paths, model_path=None, charset_path=None, workers=4):
         pdf_paths (list[str or Path]): List of paths to PDF files.
         model_path (str, optional): Path to model.
         charset_path (str, optional): Path to charset.
-        workers (int, optional): Workers for parallelism.
+        workers (int, optional): Number of worker processes.
         
     Returns:
         list[list[str]]: List of lists of recognized text per page for each PDF.
+
+    Note:
+        Workers are separate processes. On platforms that spawn them (macOS, Windows),
+        call this from under an ``if __name__ == "__main__":`` guard.
     """
-    def process_single_pdf(path):
-        return read_pdf(path, model_path, charset_path)
+    pdf_paths = list(pdf_paths)
+    workers = min(workers, len(pdf_paths))
+    if workers <= 1:
+        ocr = MonOCR(model_path, charset_path)
+        return [_ocr_pdf(ocr, path) for path in pdf_paths]
 
-    with ThreadPoolExecutor(max_workers=workers) as executor:
-        results = list(executor.map(process_single_pdf, pdf_paths))
+    with _process_pool(workers, model_path, charset_path) as executor:
+        results = list(executor.map(_read_pdf_worker, pdf_paths))
         
     return results
 
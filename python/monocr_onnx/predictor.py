@@ -1,85 +1,278 @@
+import cv2
 import numpy as np
 import onnxruntime as ort
 from PIL import Image
 from pathlib import Path
+import functools
 import importlib.resources
+import os
+import threading
 from .model_manager import ModelManager
-from .segmenter import LineSegmenter
+from .segmenter import LineSegmenter, to_gray
+
+@functools.lru_cache(maxsize=None)
+def _load_charset(charset_path):
+    """
+    Read a charset file once per process.
+    """
+    with open(charset_path, 'r', encoding='utf-8') as f:
+        return f.read().strip()
+
+@functools.lru_cache(maxsize=None)
+def _load_default_charset():
+    """
+    Resolve and read the bundled charset once per process.
+    """
+    try:
+        # Python 3.9+ resource loading
+        ref = importlib.resources.files('monocr_onnx') / 'charset.txt'
+        with ref.open('r', encoding='utf-8') as f:
+            return f.read().strip()
+    except Exception as e:
+        # Fallback for older python or loose script usage
+        charset_file = Path(__file__).parent / 'charset.txt'
+        if charset_file.exists():
+             with open(charset_file, 'r', encoding='utf-8') as f:
+                return f.read().strip()
+        else:
+            raise RuntimeError(f"Charset file not found. Error: {e}")
+
+@functools.lru_cache(maxsize=4)
+def _char_table(charset):
+    """
+    Index -> char lookup table for decoding, index 0 is the CTC blank.
+    Shared read-only between instances using the same charset.
+    """
+    return np.array([''] + list(charset), dtype=object)
 
 class MonOCR:
-    def __init__(self, model_path=None, charset_path=None):
+    # Pixel scale factor, applied in a single fused multiply during preprocessing
+    SCALE = np.float32(1.0 / 255.0)
+    # Largest batch buffer (in float32 elements, 16 MiB) kept around between calls
+    SCRATCH_MAX_SIZE = 4 * 1024 * 1024
+    # Lines are batched together only while the widest is within this factor of the narrowest
+    BATCH_WIDTH_RATIO = 1.5
+    # Pages at most this tall, or wider than this aspect ratio, are treated as one line
+    SINGLE_LINE_MAX_HEIGHT = 96
+    SINGLE_LINE_MIN_ASPECT = 8
+
+    def __init__(self, model_path=None, charset_path=None, intra_op_num_threads=None, providers=None,
+                 width_buckets=None):
         if model_path is None:
-            manager = ModelManager()
-            model_path = manager.get_model_path()
-            
-        self.session = ort.InferenceSession(str(model_path), providers=['CPUExecutionProvider'])
+            model_path = ModelManager().resolve_model_path()
+
+        if intra_op_num_threads is None:
+            intra_op_num_threads = int(os.environ.get('MONOCR_INTRA', os.cpu_count() or 1))
+
+        self.model_path = str(model_path)
+        self.intra_op_num_threads = intra_op_num_threads
+        if providers is None:
+            providers = ['CPUExecutionProvider']
+            if 'CUDAExecutionProvider' in ort.get_available_providers():
+                providers.insert(0, 'CUDAExecutionProvider')
+        self.providers = list(providers)
+        self.session = self._create_session()
+        self.input_name = self.session.get_inputs()[0].name
+        self.output_name = self.session.get_outputs()[0].name
+
+        # Symbolic width dim of the model input, None if the model has a fixed width
+        width_dim = self.session.get_inputs()[0].shape[-1]
+        self._width_dim = width_dim if isinstance(width_dim, str) else None
+        # Opt-in: batch widths are padded up to one of these and each bucket gets its
+        # own fixed-shape session. Every bucket session holds a full copy of the model,
+        # so this only pays off for long-lived instances with a known width range.
+        self.width_buckets = tuple(sorted(width_buckets)) if width_buckets else ()
+        # Bucket width -> specialized session, created on first use
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+        # IOBinding is not thread-safe, keep one per thread in case an instance is shared
+        self._local = threading.local()
         self.segmenter = LineSegmenter()
         
         if charset_path:
-            with open(charset_path, 'r', encoding='utf-8') as f:
-                self.charset = f.read().strip()
+            self.charset = _load_charset(str(charset_path))
         else:
-            # Load bundled charset
-            try:
-                # Python 3.9+ resource loading
-                ref = importlib.resources.files('monocr_onnx') / 'charset.txt'
-                with ref.open('r', encoding='utf-8') as f:
-                    self.charset = f.read().strip()
-            except Exception as e:
-                # Fallback for older python or loose script usage
-                charset_file = Path(__file__).parent / 'charset.txt'
-                if charset_file.exists():
-                     with open(charset_file, 'r', encoding='utf-8') as f:
-                        self.charset = f.read().strip()
-                else:
-                    raise RuntimeError(f"Charset file not found. Error: {e}")
+            self.charset = _load_default_charset()
+        self._chars = _char_table(self.charset)
 
-    def preprocess(self, img):
-        if img.mode != 'L':
-            img = img.convert('L')
+    def _create_session(self, width=None):
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        opts.intra_op_num_threads = self.intra_op_num_threads
+        opts.inter_op_num_threads = 1
+        # Don't busy-wait idle pool threads between line inferences
+        opts.add_session_config_entry("session.intra_op.allow_spinning", "0")
+        if width is not None:
+            # Pin the width so ORT plans the graph once for this shape
+            opts.add_free_dimension_override_by_name(self._width_dim, width)
+            
+        return ort.InferenceSession(self.model_path, sess_options=opts, providers=self.providers)
+
+    def _bucket_width(self, width):
+        """
+        Smallest width bucket that fits, or width itself if none does.
+        """
+        if self._width_dim is not None:
+            for bucket in self.width_buckets:
+                if width <= bucket:
+                    return bucket
+        return width
+
+    def _get_session(self, width):
+        if self._width_dim is None or width not in self.width_buckets:
+            return self.session
+
+        session = self._sessions.get(width)
+        if session is None:
+            with self._sessions_lock:
+                session = self._sessions.get(width)
+                if session is None:
+                    session = self._sessions[width] = self._create_session(width)
+        return session
+
+    def _resize(self, img):
+        """
+        Resize a line image (PIL.Image or grayscale np.ndarray) to a 64 px tall uint8 array.
+        """
+        img = to_gray(img)
         
         target_height = 64
+        height, width = img.shape
         # Handle small images
-        if img.height == 0:
+        if height == 0:
              return None
              
-        aspect_ratio = img.width / img.height
+        aspect_ratio = width / height
         target_width = int(target_height * aspect_ratio)
-        img = img.resize((target_width, target_height), Image.Resampling.BILINEAR)
+        if target_width == 0:
+             return None
+
+        # OpenCV's SIMD resize on the raw uint8 buffer; INTER_AREA when shrinking
+        # to keep the anti-aliasing that PIL's BILINEAR filter applied.
+        interpolation = cv2.INTER_AREA if height > target_height else cv2.INTER_LINEAR
+        return cv2.resize(img, (target_width, target_height), interpolation=interpolation)
+
+    def preprocess(self, img):
+        """
+        Resize a line image (PIL.Image or grayscale np.ndarray) to a (1, 1, 64, W) tensor.
+        """
+        resized = self._resize(img)
+        if resized is None:
+            return None
         
-        img_arr = np.array(img).astype(np.float32) / 255.0
-        img_arr = np.expand_dims(img_arr, axis=0) # Add channel dim
-        img_arr = np.expand_dims(img_arr, axis=0) # Add batch dim
+        # Cast + normalize in one pass, written straight into the (1, 1, H, W) tensor
+        img_arr = np.empty((1, 1) + resized.shape, dtype=np.float32)
+        np.multiply(resized, self.SCALE, out=img_arr[0, 0])
         return img_arr
 
+    def _scratch(self, shape):
+        """
+        Contiguous float32 view of the given shape over a per-thread buffer
+        that is reused across calls. Batches above SCRATCH_MAX_SIZE get a
+        one-off allocation so a single large page doesn't pin memory.
+        """
+        size = int(np.prod(shape))
+        if size > self.SCRATCH_MAX_SIZE:
+            return np.empty(shape, dtype=np.float32)
+
+        buf = getattr(self._local, 'scratch', None)
+        if buf is None or buf.size < size:
+            buf = self._local.scratch = np.empty(size, dtype=np.float32)
+        return buf[:size].reshape(shape)
+
     def decode(self, preds):
-        idx2char = {i + 1: c for i, c in enumerate(self.charset)}
-        decoded_text = []
-        prev_idx = -1
+        preds = np.asarray(preds)
+        if preds.size == 0:
+            return ""
         
-        # Simple Greedy Decoding
-        for idx in preds:
-            if idx != 0 and idx != prev_idx:
-                decoded_text.append(idx2char.get(idx, ""))
-            prev_idx = idx
+        # Simple Greedy Decoding: collapse repeats, then drop blanks
+        keep = np.empty(preds.shape, dtype=bool)
+        keep[0] = True
+        np.not_equal(preds[1:], preds[:-1], out=keep[1:])
+        keep &= (preds != 0) & (preds < len(self._chars))
             
-        return "".join(decoded_text)
+        return "".join(self._chars[preds[keep]])
+
+    def _run(self, input_data):
+        """
+        Run the session matching the input width through a reused IOBinding
+        and return the first output.
+        """
+        session = self._get_session(input_data.shape[3])
+        bindings = getattr(self._local, 'bindings', None)
+        if bindings is None:
+            bindings = self._local.bindings = {}
+        binding = bindings.get(id(session))
+        if binding is None:
+            binding = bindings[id(session)] = session.io_binding()
+
+        binding.bind_cpu_input(self.input_name, input_data)
+        # Argmax/decode run on the host, so have ORT place the output there directly
+        binding.bind_output(self.output_name, 'cpu')
+        session.run_with_iobinding(binding)
+        return binding.get_outputs()[0].numpy()
 
     def predict_line(self, img):
         if isinstance(img, (str, Path)):
             img = Image.open(img)
             
-        input_data = self.preprocess(img)
-        if input_data is None:
-            return ""
-        
-        input_name = self.session.get_inputs()[0].name
-        output_name = self.session.get_outputs()[0].name
-        
-        outputs = self.session.run([output_name], {input_name: input_data})
-        preds = np.argmax(outputs[0], axis=2)[0] # Batch size 1
-        
-        return self.decode(preds)
+        return self.predict_lines([img])[0]
+
+    def predict_lines(self, imgs):
+        """
+        Predict several line images with batched session runs.
+        Lines are sorted by width and batched with lines of similar width (or the
+        same width bucket), so little compute is spent on padding.
+        """
+        resized = [self._resize(img) for img in imgs]
+        results = [""] * len(resized)
+        order = sorted(
+            (i for i, x in enumerate(resized) if x is not None),
+            key=lambda i: resized[i].shape[1]
+        )
+
+        groups = []
+        for i in order:
+            width = resized[i].shape[1]
+            if groups and self._same_batch(groups[-1][0], width):
+                groups[-1][1].append(i)
+            else:
+                groups.append((width, [i]))
+
+        for _, group in groups:
+            for i, text in zip(group, self._predict_batch([resized[i] for i in group])):
+                results[i] = text
+            
+        return results
+
+    def _same_batch(self, first_width, width):
+        if self.width_buckets:
+            return self._bucket_width(width) == self._bucket_width(first_width)
+        return width <= first_width * self.BATCH_WIDTH_RATIO
+
+    def _predict_batch(self, resized):
+        """
+        Run one session call over resized lines, right-padded with white to the
+        width bucket of the widest line.
+        """
+        widths = [x.shape[1] for x in resized]
+        max_width = self._bucket_width(max(widths))
+        batch = self._scratch((len(resized), 1, resized[0].shape[0], max_width))
+        for row, (line, width) in enumerate(zip(resized, widths)):
+            # Normalize straight into the batch, pad the rest with white
+            np.multiply(line, self.SCALE, out=batch[row, 0, :, :width])
+            batch[row, 0, :, width:] = 1.0
+
+        outputs = self._run(batch)
+        preds = np.argmax(outputs, axis=2)
+        seq_len = preds.shape[1]
+
+        # Drop timesteps that only cover padding
+        return [
+            self.decode(preds[row, :-(-width * seq_len // max_width)])
+            for row, width in enumerate(widths)
+        ]
 
     def predict_page(self, img_path):
         """
@@ -90,10 +283,17 @@ class MonOCR:
         else:
             img = img_path
 
-        lines = self.segmenter.segment(img)
-        results = []
+        # Convert the page to grayscale once, shared by the segmenter and predictor
+        img = to_gray(img)
+
+        height, width = img.shape
+        if height <= self.SINGLE_LINE_MAX_HEIGHT or width / max(1, height) > self.SINGLE_LINE_MIN_ASPECT:
+            # Already a line crop, skip segmentation but still trim blank rows
+            return self.predict_line(self.segmenter.trim(img))
+
+        crops, _ = self.segmenter.segment(img)
         
-        if not lines:
+        if not crops:
             # Fallback: maybe it IS a single line?
             # Or return empty string?
             # Let's try to predict as single line if segmentation failed but image is smallish?
@@ -105,9 +305,7 @@ class MonOCR:
                 return text
             return ""
 
-        for line in lines:
-            text = self.predict_line(line['img'])
-            results.append(text)
+        results = self.predict_lines(crops)
             
         return "\n".join(results)
 